@@ -1,3 +1,28 @@
 __version__ = "0.2.4"
 
-from .p2d import *
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .p2d import *
+
+__all__ = [
+    'convert',
+    'DEFAULT_COLOR',
+    'DEFAULT_CONFIG_FILE',
+    'Options',
+    'Polygon2DOMjudge',
+    'ProcessError',
+]
+
+
+def __getattr__(name: str):
+    # the converter is imported on first use, so the CLI can answer --help and --version without loading it
+    if name in __all__:
+        from . import p2d
+        return getattr(p2d, name)
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+
+def __dir__():
+    # list the lazily imported names as well, for completion and introspection
+    return sorted(list(globals()) + __all__)
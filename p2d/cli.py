@@ -3,11 +3,7 @@ from argparse import ArgumentParser, ArgumentError
 from pathlib import Path
 from typing import cast, List, Optional
 
-import betterlogging as logging  # type: ignore
-
 from . import __version__
-from .p2d import convert, DEFAULT_COLOR
-from .utils import load_config
 from .typing import Config
 
 
@@ -16,7 +12,7 @@ def main(argv: Optional[List[str]] = None) -> int:
     parser = ArgumentParser(description='Process Polygon Package to Domjudge Package.')
     parser.add_argument('package', type=Path, help='path of the polygon package directory')
     parser.add_argument('--code', type=str, help='problem short name in domjudge', required=True)
-    parser.add_argument('--color', type=str, default=DEFAULT_COLOR,
+    parser.add_argument('--color', type=str,
                         help='problem color in domjudge (in #RRGGBB format)')
     parser.add_argument('-l', '--log-level', default='info',
                         help='set log level (debug, info, warning, error, critical)')
@@ -36,13 +32,22 @@ def main(argv: Optional[List[str]] = None) -> int:
                         help='hide the sample input and output from the problem statement, no sample data will be available for the contestants (force True if this is an interactive problem).')
     parser.add_argument('--testset', type=str,
                         help='specify the testset to convert, must specify the testset name if the problem has multiple testsets.')
+    parser.add_argument('--no-compress', action='store_true',
+                        help='store the files in the output package without compression, which is faster for large test data.')
     parser.add_argument('--config', type=Path, default='config.toml',
                         help='path of the config file to override the default config, default is using "config.toml" in current directory')
     args = parser.parse_args(argv)
 
+    # imported after parsing, so --help and --version do not pay for them
+    import betterlogging as logging  # type: ignore
+
+    # configure logging first, so warnings emitted while importing the converter are formatted as well
     logging.basic_colorized_config(level=args.log_level.upper())
     logger = logging.getLogger(__name__)
 
+    from .p2d import convert
+    from .utils import load_config
+
     try:
         config_file = Path(args.config)
         if config_file.is_file():
@@ -59,7 +64,6 @@ def main(argv: Optional[List[str]] = None) -> int:
 
         _kwargs = {
             'short_name': args.code,
-            'color': args.color,
             'hide_sample': args.hide_sample,
             'auto_detect_std_checker': args.auto,
             'force_default_validator': args.default,
@@ -68,8 +72,11 @@ def main(argv: Optional[List[str]] = None) -> int:
             'output_limit': args.output_limit,
             'skip_confirmation': args.yes,
             'testset_name': args.testset,
+            'compress': not args.no_compress,
             'config': config,
         }
+        if args.color is not None:
+            _kwargs['color'] = args.color
 
         convert(
             args.package,
@@ -1,16 +1,25 @@
-import xml.etree.ElementTree
 import sys
 
+try:
+    from lxml import etree as ET  # type: ignore
+except ImportError:
+    import xml.etree.ElementTree as ET  # type: ignore
+
 from argparse import ArgumentParser, ArgumentError
 from pathlib import Path
 
-import betterlogging as logging  # type: ignore
-
 from . import __version__
 
+PROBLEM_TEMPLATE = '''# Problem {index}: {name} (change the color if needed)
+p2d --yes --code {index} --color "#FF0000" \\
+    --output "$DOMJUDGE_PACKAGE_DIR/{name}.zip" --auto \\
+    "$POLYGON_PACKAGE_DIR/{name}-*\\$linux.zip"
+
+'''
+
 
 def problem_index_and_name(problem):
-    return problem.attrib['index'], problem.attrib['url'].split('/')[-1]
+    return problem.attrib['index'], problem.attrib['url'].rpartition('/')[2]
 
 
 def main():
@@ -21,27 +30,33 @@ def main():
                         help='set log level (debug, info, warning, error, critical)')
     args = parser.parse_args()
 
+    # imported after parsing, so --help and --version do not pay for it
+    import betterlogging as logging  # type: ignore
+
     logging.basic_colorized_config(level=args.log_level.upper())
     logger = logging.getLogger(__name__)
 
     contest_xml = Path(args.contest_xml)
     try:
-        tree = xml.etree.ElementTree.parse(contest_xml)
-        root = tree.getroot()
-        problems = root.find('problems')
-        logger.info(f'Found {len(problems)} problems in {contest_xml}')
-        print('#!/bin/bash')
-        print('POLYGON_PACKAGE_DIR=polygon      # change this to the polygon package directory')
-        print('DOMJUDGE_PACKAGE_DIR=domjudge    # change this to the domjudge package directory')
-        print()
-        for problem in problems:
+        out = [
+            '#!/bin/bash\n',
+            'POLYGON_PACKAGE_DIR=polygon      # change this to the polygon package directory\n',
+            'DOMJUDGE_PACKAGE_DIR=domjudge    # change this to the domjudge package directory\n',
+            '\n',
+        ]
+        count = 0
+        # stream contest.xml, each problem is released as soon as it is formatted
+        for _, problem in ET.iterparse(str(contest_xml), events=('end',)):
+            if problem.tag != 'problem':
+                continue
+            count += 1
             index, name = problem_index_and_name(problem)
             logger.info(f'Problem {index}: {name}')
-            print(f'''# Problem {index}: {name} (change the color if needed)
-p2d --yes --code {index} --color "#FF0000" \\
-    --output "$DOMJUDGE_PACKAGE_DIR/{name}.zip" --auto \\
-    "$POLYGON_PACKAGE_DIR/{name}-*\\$linux.zip"
-''')
+            out.append(PROBLEM_TEMPLATE.format(index=index, name=name))
+            problem.clear()
+        # the script is written at once, a broken contest.xml leaves no partial output
+        sys.stdout.write(''.join(out))
+        logger.info(f'Found {count} problems in {contest_xml}')
     except ArgumentError as e:
         logger.error(e)
         sys.exit(2)
@@ -1,22 +1,28 @@
 from __future__ import annotations
 
 import errno
+import functools
 import logging
 import os
-import shutil
+import stat
 import sys
 import tempfile
-import xml.etree.ElementTree
 import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import cast, Any, Dict, List, Optional, Sequence, Tuple, Type, TypedDict, TYPE_CHECKING
-from xml.etree.ElementTree import Element, ElementTree
+from typing import (
+    cast, Any, BinaryIO, Dict, List, Optional, Sequence, Set, Tuple, Type, TypedDict, Union, TYPE_CHECKING,
+)
+from xml.etree.ElementTree import Element
 
 import yaml
 
 from . import __version__
 from .typing import Config, ValidatorFlags, Result
-from .utils import ensure_dir, load_config, update_dict, get_normalized_lang
+from .utils import (
+    copy_file, ensure_dir, ensure_no_file, extract_zip, link_file, load_config, read_files, same_text, scan_tree,
+    READ_AHEAD_MAX_FILE_SIZE, update_dict, get_normalized_lang,
+)
 
 if sys.version_info < (3, 11):
     from typing_extensions import Unpack
@@ -26,15 +32,55 @@ else:
 if TYPE_CHECKING:
     from _typeshed import StrPath
 
+try:
+    # lxml is optional, it parses problem.xml in C and falls back to the stdlib parser
+    from lxml import etree as ET  # type: ignore
+except ImportError:
+    import xml.etree.ElementTree as ET  # type: ignore
+
 logger = logging.getLogger(__name__)
 
-DEFAULT_ASSET_PATH = Path(__file__).resolve().parent / 'asset'
-DEFAULT_TESTLIB_PATH = Path(__file__).resolve().parent / 'testlib'
+# the libyaml based dumper is much faster, it is not available when PyYAML is built without libyaml
+YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# absolute paths without resolving symlinks, which would lstat every component at import
+_PACKAGE_DIR = Path(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_ASSET_PATH = _PACKAGE_DIR / 'asset'
+DEFAULT_TESTLIB_PATH = _PACKAGE_DIR / 'testlib'
 DEFAULT_CONFIG_FILE = Path(os.getenv('CONFIG_PATH', DEFAULT_ASSET_PATH)) / 'config.toml'
 DEFAULT_COLOR = '#000000'
 UNKNOWN = 'unknown'
 
-TESTLIB_PATH = (Path(os.getenv('TESTLIB_PATH', DEFAULT_TESTLIB_PATH)) / 'testlib.h').resolve()
+TESTLIB_PATH = Path(os.path.abspath(os.path.join(os.getenv('TESTLIB_PATH', DEFAULT_TESTLIB_PATH), 'testlib.h')))
+
+
+def _getenv_int(name: str, default: int, minimum: int, maximum: Optional[int] = None) -> int:
+    """Read an integer from the environment, an invalid value is ignored with a warning."""
+    value = os.getenv(name)
+    if value is None:
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        number = minimum - 1
+    if number < minimum or maximum is not None and number > maximum:
+        expected = f'between {minimum} and {maximum}' if maximum is not None else f'at least {minimum}'
+        logger.warning(f'{name}={value!r} is invalid, it should be an integer {expected}, use {default} instead.')
+        return default
+    return number
+
+
+# number of threads staging the test data, 0 (the default) lets the executor decide, 1 stages them one by one
+PARALLEL_COPY = _getenv_int('P2D_PARALLEL_COPY', 0, minimum=0)
+
+# deflate level of the output package, 1 is several times faster than the zlib default and still compresses text well
+ZIP_LEVEL = _getenv_int('P2D_ZIP_LEVEL', 1, minimum=0, maximum=9)
+
+
+@functools.lru_cache(maxsize=1)
+def _testlib() -> bytes:
+    """Read testlib.h once, it is shared by all problems converted in this process."""
+    return TESTLIB_PATH.read_bytes()
 
 
 class _Polygon2DOMjudgeArgs(TypedDict, total=False):
@@ -43,12 +89,16 @@ class _Polygon2DOMjudgeArgs(TypedDict, total=False):
     validator_flags: ValidatorFlags
     hide_sample: bool
     testset_name: Optional[str]
+    compress: bool
+    output_buffer: Optional[BinaryIO]
+    cache_problem_xml: bool
     config: Config
 
 
 class _ProblemArgs(TypedDict, total=False):
     language_preference: Sequence[str]
     testset_name: Optional[str]
+    cache: bool
 
 
 class ProcessError(RuntimeError):
@@ -68,7 +118,17 @@ class Polygon2DOMjudge:
             'chinese',
         )
 
+        # top-level sections of problem.xml read by the converter, others are dropped while parsing
+        _SECTIONS = (
+            'names',
+            'judging',
+            'assets',
+        )
+
         class Test:
+            # one instance per test, slots keep them small for problems with many tests
+            __slots__ = ('method', 'description', 'cmd', 'sample')
+
             def __init__(
                 self,
                 method: str,
@@ -87,6 +147,8 @@ class Polygon2DOMjudge:
                 return f'{description} {cmd}'.strip()
 
         class Executable:
+            __slots__ = ('path', 'name')
+
             def __init__(self, path: str, name: str = UNKNOWN, **kwargs) -> None:
                 self.path = path
                 self.name = name
@@ -116,12 +178,17 @@ class Polygon2DOMjudge:
 
             language_preference = kwargs.get('language_preference', self._LANGUAGE_PREFERENCE)
             testset_name = kwargs.get('testset_name', None)
+            cache = kwargs.get('cache', False)
 
-            root = xml.etree.ElementTree.parse(problem_xml)
+            root = self._parse(problem_xml, cache)
             name, language = self._get_preference_name(root.find('names'), language_preference)
 
             testset = self._get_testset(root, testset_name)
 
+            # look up checker, interactor and solutions from the same assets element
+            if (assets := root.find('assets')) is None:
+                assets = ET.Element('assets')
+
             timelimit = testset.find('time-limit')
             memorylimit = testset.find('memory-limit')
             input_path_pattern = testset.find('input-path-pattern')
@@ -150,8 +217,11 @@ class Polygon2DOMjudge:
             self.outputlimit = -1
             self.input_path_pattern = input_path_pattern.text
             self.answer_path_pattern = answer_path_pattern.text
-            self.checker = self.Executable.from_element(root.find('assets/checker[source]'))
-            self.interactor = self.Executable.from_element(root.find('assets/interactor[source]'))
+            self.checker = self.Executable.from_element(assets.find('checker[source]'))
+            self.interactor = self.Executable.from_element(assets.find('interactor[source]'))
+            # name of the standard checker without the 'std::' prefix, None if the checker is not a standard one
+            self.std_checker_base = self.checker.name[5:] \
+                if self.checker is not None and self.checker.name.startswith('std::') else None
             self.tests = tuple(
                 self.Test(
                     method=test.attrib['method'],
@@ -160,7 +230,50 @@ class Polygon2DOMjudge:
                     sample=bool(test.attrib.get('sample', False))
                 ) for test in testset.findall('tests/test')
             )
-            self.solutions = tuple(root.findall('assets/solutions/solution[@tag]'))
+            self.solutions = tuple(assets.findall('solutions/solution[@tag]'))
+
+        @classmethod
+        def _parse(cls, problem_xml: StrPath, cache: bool = False) -> Element:
+            """Parse problem.xml, or reuse the tree parsed from the same unmodified file.
+
+            Args:
+                problem_xml (StrPath): Path to problem.xml.
+                cache (bool, optional): Whether to cache the tree, only useful when the file is kept
+                    after the conversion, e.g. not extracted to a temporary directory.
+
+            Returns:
+                Element: The root element of problem.xml, which is shared and must not be modified.
+            """
+            if not cache:
+                return cls._iterparse(problem_xml)
+            st = os.stat(problem_xml)
+            return cls._cached_iterparse(os.path.abspath(problem_xml), st.st_mtime_ns, st.st_size)
+
+        @classmethod
+        @functools.lru_cache(maxsize=8)
+        def _cached_iterparse(cls, problem_xml: str, mtime_ns: int, size: int) -> Element:
+            # mtime and size are only part of the cache key, so a modified file is parsed again
+            return cls._iterparse(problem_xml)
+
+        @classmethod
+        def _iterparse(cls, problem_xml: StrPath) -> Element:
+            """Parse problem.xml incrementally.
+
+            Sections which are not used (statements, files, documents, etc.) are cleared
+            as soon as they are parsed, so the whole tree is never kept in memory.
+            """
+            root: Optional[Element] = None
+            depth = 0
+            for event, ele in ET.iterparse(problem_xml, events=('start', 'end')):
+                if event == 'start':
+                    if root is None:
+                        root = ele
+                    depth += 1
+                    continue
+                depth -= 1
+                if depth == 1 and ele.tag not in cls._SECTIONS:
+                    ele.clear()
+            return cast(Element, root)
 
         @staticmethod
         def _get_preference_name(
@@ -196,7 +309,7 @@ class Polygon2DOMjudge:
             logger.error('Name is invalid in problem.xml.')
             raise ProcessError('Name is invalid in problem.xml.')
 
-        def _get_testset(self, root: ElementTree, testset_name: Optional[str]) -> Element:
+        def _get_testset(self, root: Element, testset_name: Optional[str]) -> Element:
             # if testset_name is not specified, use the only testset if there is only one testset
             if testset_name is None:
                 if t := root.findall('judging/testset'):
@@ -244,7 +357,11 @@ class Polygon2DOMjudge:
         validator_flags = kwargs.get('validator_flags', cast(ValidatorFlags, ()))
         hide_sample = kwargs.get('hide_sample', False)
         testset_name = kwargs.get('testset_name', None)
-        config = kwargs.get('config', cast(Config, load_config(DEFAULT_CONFIG_FILE)))
+        compress = kwargs.get('compress', True)
+        output_buffer = kwargs.get('output_buffer', None)
+        cache_problem_xml = kwargs.get('cache_problem_xml', False)
+        # the default config is only loaded when none is given, convert() always passes one
+        config = kwargs['config'] if 'config' in kwargs else cast(Config, load_config(DEFAULT_CONFIG_FILE))
 
         self.package_dir = Path(package_dir)
         self.short_name = short_name
@@ -253,6 +370,8 @@ class Polygon2DOMjudge:
         self.output_file = Path(output_file)
 
         self._config = config
+        self._compress = compress
+        self._output_buffer = output_buffer
 
         logger.debug('Parse \'problem.xml\':')
         if testset_name:
@@ -261,6 +380,7 @@ class Polygon2DOMjudge:
             self.package_dir / 'problem.xml',
             language_preference=self._config['language_preference'],
             testset_name=testset_name,
+            cache=cache_problem_xml,
         )
 
         if force_default_validator and auto_detect_std_checker:
@@ -269,32 +389,29 @@ class Polygon2DOMjudge:
 
         self._replace_sample = not hide_sample  # always replace sample with the sample in statements when hide_sample is False
         self._hide_sample = hide_sample or self._problem.interactor is not None
-        self._use_std_checker = auto_detect_std_checker and \
-            self._problem.checker is not None and self._problem.checker.name.startswith('std::') or \
+        self._use_std_checker = auto_detect_std_checker and self._problem.std_checker_base is not None or \
             force_default_validator
         self._validator_flags: ValidatorFlags = ()
 
         if self._use_std_checker:
             if force_default_validator:
                 self._validator_flags = validator_flags
-            elif self._problem.checker is not None and self._problem.checker.name.startswith('std::'):
+            elif self._problem.std_checker_base is not None:
                 self._validator_flags = cast(ValidatorFlags,
-                                             self._config['flag'].get(self._problem.checker.name[5:], ()))
+                                             self._config['flag'].get(self._problem.std_checker_base, ()))
             else:
                 raise ProcessError('Logic error in auto_detect_std_checker.')
 
     def _write_ini(self) -> Polygon2DOMjudge:
         logger.debug('Add \'domjudge-problem.ini\':')
-        ini_file = f'{self.temp_dir}/domjudge-problem.ini'
+        ini_file = self.temp_dir / 'domjudge-problem.ini'
         ini_content = (f'short-name = {self.short_name}',
                        f'timelimit = {self._problem.timelimit}',
                        f'color = {self.color}')
         for line in ini_content:
             logger.info(line)
 
-        with open(ini_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(ini_content))
-            f.write('\n')
+        ini_file.write_text(''.join(f'{line}\n' for line in ini_content), encoding='utf-8')
 
         return self
 
@@ -331,8 +448,8 @@ class Polygon2DOMjudge:
                 ensure_dir(interactor_dir)
                 if interactor_file.suffix == '.cpp':
                     # only copy testlib.h when the interactor is written in C++
-                    shutil.copyfile(TESTLIB_PATH, interactor_dir / 'testlib.h')
-                shutil.copyfile(interactor_file, interactor_dir / interactor_file.name)
+                    (interactor_dir / 'testlib.h').write_bytes(_testlib())
+                copy_file(interactor_file, interactor_dir / interactor_file.name)
             elif self._problem.checker is not None:
                 logger.info('Use custom checker.')
                 yaml_content['validation'] = 'custom'
@@ -340,109 +457,136 @@ class Polygon2DOMjudge:
                 ensure_dir(checker_dir)
                 if checker_file.suffix == '.cpp':
                     # only copy testlib.h when the checker is written in C++
-                    shutil.copyfile(TESTLIB_PATH, checker_dir / 'testlib.h')
-                shutil.copyfile(checker_file, checker_dir / checker_file.name)
+                    (checker_dir / 'testlib.h').write_bytes(_testlib())
+                copy_file(checker_file, checker_dir / checker_file.name)
             else:
                 logger.error('No checker found.')
                 raise ProcessError('No checker found.')
 
-        with open(yaml_file, 'w', encoding='utf-8') as f:
-            yaml.dump(yaml_content, f, allow_unicode=True, default_flow_style=False)
+        # render the whole document first and write it with a single call
+        yaml_file.write_text(yaml.dump(yaml_content, Dumper=YAML_DUMPER, allow_unicode=True, default_flow_style=False),
+                             encoding='utf-8')
 
         return self
 
     def _add_tests(self) -> Polygon2DOMjudge:
         logger.debug('Add tests:')
 
-        ensure_dir(self.temp_dir / 'data' / 'sample')
-        ensure_dir(self.temp_dir / 'data' / 'secret')
+        # plain string paths, Path objects are not worth building for each test
+        package_dir = os.fspath(self.package_dir)
+        sample_dir = os.path.join(self.temp_dir, 'data', 'sample')
+        secret_dir = os.path.join(self.temp_dir, 'data', 'secret')
+        statement_dir = os.path.join(package_dir, 'statements', self._problem.language)
+        os.makedirs(sample_dir, exist_ok=True)
+        os.makedirs(secret_dir, exist_ok=True)
         sample_input_path_pattern = self._config['example_path_pattern']['input']
         sample_output_path_pattern = self._config['example_path_pattern']['output']
+        files: List[Tuple[str, str]] = []
+        # checked once, so no message is formatted for each test when INFO is disabled
+        log_info = logger.isEnabledFor(logging.INFO)
 
-        def compare(src: StrPath, dst: StrPath):
-            s, t = Path(src).name, Path(dst).name
+        def compare(src: str, dst: str):
+            s, t = os.path.basename(src), os.path.basename(dst)
 
             logger.debug(f'Compare {s} and {t}')
-            with open(src, 'r') as f1, open(dst, 'r') as f2:
-                if f1.read() != f2.read():
-                    logger.warning(f'{s} and {t} are not the same, use {t}.')
+            # the files are never read as a whole, and CRLF is the same as LF
+            if not same_text(src, dst):
+                logger.warning(f'{s} and {t} are not the same, use {t}.')
 
         for idx, test in enumerate(self._problem.tests, 1):
-            input_src = self.package_dir / (self._problem.input_path_pattern % idx)
-            output_src = self.package_dir / (self._problem.answer_path_pattern % idx)
+            name = f'{idx:02d}'
+            input_src = os.path.join(package_dir, self._problem.input_path_pattern % idx)
+            output_src = os.path.join(package_dir, self._problem.answer_path_pattern % idx)
 
             if test.sample and not self._hide_sample:
                 # interactor can not support custom sample because DOMjudge always use sample input to test
-                sample_input_src = (
-                    self.package_dir / 'statements' / self._problem.language / (sample_input_path_pattern % idx))
-                sample_output_src = (
-                    self.package_dir / 'statements' / self._problem.language / (sample_output_path_pattern % idx))
-                if self._replace_sample and sample_input_src.exists():
+                sample_input_src = os.path.join(statement_dir, sample_input_path_pattern % idx)
+                sample_output_src = os.path.join(statement_dir, sample_output_path_pattern % idx)
+                if self._replace_sample and os.path.exists(sample_input_src):
                     compare(input_src, sample_input_src)
                     input_src = sample_input_src
-                if self._replace_sample and sample_output_src.exists():
+                if self._replace_sample and os.path.exists(sample_output_src):
                     compare(output_src, sample_output_src)
                     output_src = sample_output_src
-                input_dst = self.temp_dir / 'data' / 'sample' / f'{"%02d" % idx}.in'
-                output_dst = self.temp_dir / 'data' / 'sample' / f'{"%02d" % idx}.ans'
-                desc_dst = self.temp_dir / 'data' / 'sample' / f'{"%02d" % idx}.desc'
+                input_dst = os.path.join(sample_dir, f'{name}.in')
+                output_dst = os.path.join(sample_dir, f'{name}.ans')
+                desc_dst = os.path.join(sample_dir, f'{name}.desc')
 
-                logger.info(f'* sample: {"%02d" % idx}.(in/ans) {test.method}')
+                if log_info:
+                    logger.info(f'* sample: {name}.(in/ans) {test.method}')
             else:
-                input_dst = self.temp_dir / 'data' / 'secret' / f'{"%02d" % idx}.in'
-                output_dst = self.temp_dir / 'data' / 'secret' / f'{"%02d" % idx}.ans'
-                desc_dst = self.temp_dir / 'data' / 'secret' / f'{"%02d" % idx}.desc'
+                input_dst = os.path.join(secret_dir, f'{name}.in')
+                output_dst = os.path.join(secret_dir, f'{name}.ans')
+                desc_dst = os.path.join(secret_dir, f'{name}.desc')
 
-                logger.info(f'* secret: {"%02d" % idx}.(in/ans) {test.method}')
+                if log_info:
+                    logger.info(f'* secret: {name}.(in/ans) {test.method}')
 
-            if self._problem.outputlimit > 0 and output_src.stat().st_size > self._problem.outputlimit * 1048576:
-                logger.warning(f'Output file {output_src.name} is exceed the output limit.')
+            if self._problem.outputlimit > 0 and os.stat(output_src).st_size > self._problem.outputlimit * 1048576:
+                logger.warning(f'Output file {os.path.basename(output_src)} is exceed the output limit.')
 
-            shutil.copyfile(input_src, input_dst)
-            shutil.copyfile(output_src, output_dst)
+            files.append((input_src, input_dst))
+            files.append((output_src, output_dst))
 
-            if test.__str__():
-                logger.info(f'{test.__str__()}')
+            if desc := test.__str__():
+                if log_info:
+                    logger.info(desc)
                 with open(desc_dst, 'w', encoding='utf-8') as f:
-                    f.write(test.__str__())
+                    f.write(desc)
                     f.write('\n')
 
+        # the file operations release the GIL, so the test data can be staged concurrently
+        if PARALLEL_COPY == 1:
+            for file in files:
+                link_file(*file)
+        else:
+            with ThreadPoolExecutor(max_workers=PARALLEL_COPY or None) as executor:
+                list(executor.map(lambda file: link_file(*file), files))
+
         return self
 
     def _add_jury_solutions(self) -> Polygon2DOMjudge:
         logger.debug('Add jury solutions:')
 
+        # plain string paths, Path objects are not worth building for each solution
+        package_dir = os.fspath(self.package_dir)
+        submissions_dir = os.path.join(self.temp_dir, 'submissions')
+        result_dirs: Set[str] = set()
         for solution in self._problem.solutions:
             tag = solution.attrib['tag']
             logger.info(f'Add jury solution: {tag}')
             results = self._config['tag'].get(tag)
 
             if results is None:
-                result_dir = self.temp_dir / 'submissions' / 'rejected'
+                result_dir = os.path.join(submissions_dir, 'rejected')
             elif len(results) == 1:
-                result_dir = self.temp_dir / 'submissions' / results[0]
+                result_dir = os.path.join(submissions_dir, results[0])
             else:
-                result_dir = self.temp_dir / 'submissions' / 'mixed'
+                result_dir = os.path.join(submissions_dir, 'mixed')
 
             if (source := solution.find('source[@path][@type]')) is not None:
-                ensure_dir(self.temp_dir / 'submissions' / result_dir)
-                src = self.package_dir / source.attrib['path']
-                dst = self.temp_dir / 'submissions' / result_dir / src.name
+                if result_dir not in result_dirs:
+                    os.makedirs(result_dir, exist_ok=True)
+                    result_dirs.add(result_dir)
+                src = os.path.join(package_dir, source.attrib['path'])
+                dst = os.path.join(result_dir, os.path.basename(src))
                 lang = source.attrib['type']
                 self._add_solutions_with_expected_result(src, dst, lang, results)
 
         return self
 
-    def _add_solutions_with_expected_result(self, src: Path, dst: Path, lang: str,  results: Optional[List[Result]]) -> None:
+    def _add_solutions_with_expected_result(self, src: StrPath, dst: StrPath, lang: str,  results: Optional[List[Result]]) -> None:
+        name = os.path.basename(src)
+
         if results is None:
             logger.warning(
                 f'Find expected result with check_manually, you may add @EXPECTED_RESULTS@ in your source code for validation.')
-            shutil.copyfile(src, dst)
+            link_file(src, dst)
             return
 
         if len(results) == 1:
-            logger.info(f'- {src.name}: Expected result: {results[0]}')
-            shutil.copyfile(src, dst)
+            logger.info(f'- {name}: Expected result: {results[0]}')
+            link_file(src, dst)
             return
 
         PROBLEM_RESULT_REMAP = {
@@ -460,11 +604,13 @@ class Polygon2DOMjudge:
 
         if '@EXPECTED_RESULTS@' in content or '@EXPECTED_SCORE@' in content:
             logger.warning(
-                f'Find @EXPECTED_RESULTS@ or @EXPECTED_SCORE@ in {src.name}, skip adding expected result.')
-            shutil.copyfile(src, dst)
+                f'Find @EXPECTED_RESULTS@ or @EXPECTED_SCORE@ in {name}, skip adding expected result.')
+            link_file(src, dst)
         else:
             logger.info(
-                f'- {src.name}: Expected result: {", ".join(map(lambda x: PROBLEM_RESULT_REMAP[x.upper()].lower(), results))}')
+                f'- {name}: Expected result: {", ".join(map(lambda x: PROBLEM_RESULT_REMAP[x.upper()].lower(), results))}')
+            # dst may be a hard link to the package from an earlier staging, do not write through it
+            ensure_no_file(dst)
             with open(dst, 'w') as f:
                 f.write(content)
                 f.write('\n')
@@ -476,9 +622,40 @@ class Polygon2DOMjudge:
                 else:
                     logger.warning(f'comment_str not found for type {lang}, skip adding expected result.')
 
-    def _archive(self):
-        shutil.make_archive(self.output_file.as_posix(), 'zip', self.temp_dir, logger=logger)
-        logger.info(f'Make package {self.output_file.name}.zip success.')
+    def _archive(self) -> Polygon2DOMjudge:
+        compression = zipfile.ZIP_DEFLATED if self._compress else zipfile.ZIP_STORED
+        members: List[Tuple[str, str, Optional[zipfile.ZipInfo]]] = [
+            (entry.path, arcname, None if entry.is_dir(follow_symlinks=False) else
+             zipfile.ZipInfo.from_file(entry.path, arcname, strict_timestamps=False))
+            for entry, arcname in scan_tree(self.temp_dir)
+        ]
+        # small files are read ahead on a thread pool, while they are written to the zip file in order here
+        contents = read_files(
+            (path, info.file_size) for path, _, info in members
+            if info is not None and info.file_size <= READ_AHEAD_MAX_FILE_SIZE
+        )
+        # the package is written to the output buffer if given, then no file is created
+        target: Union[str, BinaryIO]
+        if self._output_buffer is not None:
+            target = self._output_buffer
+        else:
+            target = f'{self.output_file}.zip'
+            # unlike shutil.make_archive, zipfile does not create the missing parent directories
+            ensure_dir(self.output_file.parent)
+        log_info = logger.isEnabledFor(logging.INFO)
+        with zipfile.ZipFile(target, 'w', compression, compresslevel=ZIP_LEVEL, strict_timestamps=False) as zip_ref:
+            for path, arcname, info in members:
+                if log_info:
+                    logger.info(f'adding \'{arcname}\'')
+                if info is None or info.file_size > READ_AHEAD_MAX_FILE_SIZE:
+                    # directories and large files are streamed, so a large test is never held in memory
+                    zip_ref.write(path, arcname)
+                    continue
+                zip_ref.writestr(info, next(contents), compression, ZIP_LEVEL)
+        if self._output_buffer is not None:
+            logger.info(f'Make package {self.output_file.name} to the output buffer success.')
+        else:
+            logger.info(f'Make package {self.output_file.name}.zip success.')
         return self
 
     def override_memory_limit(self, memory_limit: int) -> Polygon2DOMjudge:
@@ -510,17 +687,18 @@ class Polygon2DOMjudge:
 def _confirm(
     package_dir: StrPath,
     output_file: StrPath,
-    skip_confirmation: bool = False
+    skip_confirmation: bool = False,
+    to_buffer: bool = False
 ) -> None:
-    logger.info('This is Polygon2DOMjudge by cubercsl.')
-    logger.info('Process Polygon Package to DOMjudge Package.')
-    logger.info("Version: {}".format(__version__))
+    output = 'Output: the output buffer' if to_buffer else f'Output file: {output_file}.zip'
+    logger.info('This is Polygon2DOMjudge by cubercsl.\n'
+                'Process Polygon Package to DOMjudge Package.\n'
+                f'Version: {__version__}\n'
+                f'Package directory: {package_dir}\n'
+                f'{output}')
 
     if sys.platform.startswith('win'):
         logger.warning('It is not recommended running on windows.')
-
-    logger.info(f'Package directory: {package_dir}')
-    logger.info(f'Output file: {output_file}.zip')
     if not skip_confirmation:
         if input('Are you sure to continue? [y/N]').lower() == 'y':
             return
@@ -537,6 +715,8 @@ class Options(TypedDict, total=False):
     output_limit: int
     skip_confirmation: bool
     testset_name: Optional[str]
+    compress: bool
+    output_buffer: Optional[BinaryIO]
     code: str  # alias of short_name
 
 
@@ -570,6 +750,8 @@ def convert(
         'force_default_validator': kwargs.get('force_default_validator', False),
         'validator_flags': kwargs.get('validator_flags', []),
         'testset_name': kwargs.get('testset_name', None),
+        'compress': kwargs.get('compress', True),
+        'output_buffer': kwargs.get('output_buffer', None),
         'config': load_config(DEFAULT_CONFIG_FILE),
     }
 
@@ -582,32 +764,57 @@ def convert(
 
     skip_confirmation = kwargs.get('skip_confirmation', False)
 
-    with tempfile.TemporaryDirectory(prefix='p2d-polygon-') as polygon_temp_dir, \
-            tempfile.TemporaryDirectory(prefix='p2d-domjudge-') as domjudge_temp_dir:
-        package_dir = Path(package).resolve()
-        if package_dir.is_file():
-            with zipfile.ZipFile(package, 'r') as zip_ref:
-                logger.info(f'Extracting {package_dir.name} to {polygon_temp_dir}')
-                package_dir = Path(polygon_temp_dir)
-                zip_ref.extractall(package_dir)
-        elif package_dir.is_dir():
-            logger.info(f'Using {package_dir}')
+    # validate the arguments before creating any temporary directory
+    if _kwargs['auto_detect_std_checker'] and _kwargs['force_default_validator']:
+        logger.error('Can not use auto_detect_std_checker and force_default_validator at the same time.')
+        raise ValueError('Can not use auto_detect_std_checker and force_default_validator at the same time.')
+
+    # make user supplied paths absolute without resolving symlinks, which costs a lstat per component
+    cwd = os.getcwd()
+
+    package_dir = Path(os.path.normpath(os.path.join(cwd, package)))
+    try:
+        # a single stat tells whether the package is a zip file or a directory
+        mode = os.stat(package_dir).st_mode
+    except FileNotFoundError:
+        mode = 0
+    if not stat.S_ISREG(mode) and not stat.S_ISDIR(mode):
+        raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), package_dir.name)
+
+    if output:
+        output_path = os.path.normpath(os.path.join(cwd, output))
+        if output_path.endswith('.zip'):
+            output_file = Path(output_path).with_suffix('')
         else:
-            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), package_dir.name)
-
-        if output:
-            if Path(output).name.endswith('.zip'):
-                output_file = Path(output).with_suffix('').resolve()
-            else:
-                output_file = Path(output).resolve() / short_name
+            output_file = Path(os.path.join(output_path, short_name))
+    else:
+        output_file = Path(os.path.join(cwd, short_name))
+
+    # the same name as the archive written by Polygon2DOMjudge._archive, lexists also catches dangling symlinks
+    output_zip = f'{output_file}.zip'
+    if _kwargs['output_buffer'] is None and os.path.lexists(output_zip):
+        raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), output_zip)
+
+    with tempfile.TemporaryDirectory(prefix='p2d-') as temp_dir:
+        # one temporary directory holds both the extracted polygon package and the staged domjudge package
+        domjudge_temp_dir = os.path.join(temp_dir, 'domjudge')
+        os.mkdir(domjudge_temp_dir)
+
+        if stat.S_ISREG(mode):
+            # the polygon directory is only needed to extract a zip package, a directory is used in place
+            polygon_temp_dir = os.path.join(temp_dir, 'polygon')
+            os.mkdir(polygon_temp_dir)
+            logger.info(f'Extracting {package_dir.name} to {polygon_temp_dir}')
+            extract_zip(package_dir, polygon_temp_dir)
+            package_dir = Path(polygon_temp_dir)
         else:
-            output_file = Path.cwd() / short_name
-
-        if output_file.with_suffix('.zip').resolve().exists():
-            raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), f'{output_file.with_suffix(".zip")}')
+            logger.info(f'Using {package_dir}')
 
-        _confirm(package_dir, output_file, skip_confirmation=skip_confirmation)
+        _confirm(package_dir, output_file, skip_confirmation=skip_confirmation,
+                 to_buffer=_kwargs['output_buffer'] is not None)
 
+        # an extracted package is deleted with the temporary directory, caching its problem.xml would never hit
+        _kwargs['cache_problem_xml'] = stat.S_ISDIR(mode)
         p = Polygon2DOMjudge(package_dir, domjudge_temp_dir, output_file, short_name, color, **_kwargs)
 
         if kwargs.get('memory_limit'):
@@ -1,20 +1,52 @@
 from __future__ import annotations
 
 import collections
+import copy
+import errno
+import filecmp
+import functools
+import os
 import shutil
 import string
+import sys
+import threading
+import zipfile
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import Any, BinaryIO, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
 
 import tomli
 
 if TYPE_CHECKING:
     from _typeshed import StrPath
 
+if sys.platform.startswith('linux'):
+    import fcntl
+
+# ioctl request to share the data blocks of a file, see linux/fs.h
+FICLONE = 0x40049409
+
+# errors of os.link which mean the file can not be linked, so it is copied instead
+LINK_UNSUPPORTED_ERRNOS = (errno.EXDEV, errno.EPERM, errno.EMLINK, errno.ENOTSUP, errno.EOPNOTSUPP)
+
+# bytes requested by each copy_file_range call
+COPY_FILE_RANGE_SIZE = 1 << 30
+
+# buffer size used to copy a member out of a zip file
+ZIP_COPY_BUFSIZE = 1 << 20
+
+# upper bound of the file contents read ahead by read_files
+READ_AHEAD_BYTES = 64 << 20
+
+# files larger than this should be streamed instead of being read whole by read_files
+READ_AHEAD_MAX_FILE_SIZE = 1 << 20
+
+# characters read from each file at a time by same_text
+SAME_TEXT_BLOCK_SIZE = 1 << 20
+
 
 def ensure_dir(s: Path):
-    if not s.exists():
-        s.mkdir(parents=True)
+    s.mkdir(parents=True, exist_ok=True)
 
 
 def ensure_no_dir(s: Path):
@@ -22,10 +54,223 @@ def ensure_no_dir(s: Path):
         shutil.rmtree(s)
 
 
+def ensure_no_file(s: StrPath):
+    try:
+        os.unlink(s)
+    except FileNotFoundError:
+        pass
+
+
+def _copy_file_range(src_fd: int, dst_fd: int) -> bool:
+    """Copy the whole file in the kernel with copy_file_range.
+
+    Returns False if it is not supported for these files and nothing has been copied.
+    """
+    copied = 0
+    while True:
+        try:
+            n = os.copy_file_range(src_fd, dst_fd, COPY_FILE_RANGE_SIZE)
+        except OSError as e:
+            if copied == 0 and e.errno in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                return False
+            raise
+        if n == 0:
+            return True
+        copied += n
+
+
+def copy_file(src: StrPath, dst: StrPath) -> None:
+    """Copy the content of src to dst.
+
+    On Linux, the file is cloned first, which is O(1) on copy-on-write filesystems (btrfs, xfs, ...),
+    then copied in the kernel with copy_file_range, which can also use server-side copies (NFS, ...).
+    If neither is supported, fall back to shutil.copyfile.
+    """
+    if sys.platform.startswith('linux'):
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            # dst is truncated when it is opened, so refuse to copy a file onto itself like shutil.copyfile
+            try:
+                same_file = os.path.samestat(os.fstat(src_fd), os.stat(dst))
+            except FileNotFoundError:
+                same_file = False
+            if same_file:
+                raise shutil.SameFileError(f'{src!r} and {dst!r} are the same file')
+            dst_fd = os.open(dst, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+            try:
+                try:
+                    fcntl.ioctl(dst_fd, FICLONE, src_fd)
+                    return
+                except OSError:
+                    pass
+                if hasattr(os, 'copy_file_range') and _copy_file_range(src_fd, dst_fd):
+                    return
+            finally:
+                os.close(dst_fd)
+        finally:
+            os.close(src_fd)
+    shutil.copyfile(src, dst)
+
+
+def link_file(src: StrPath, dst: StrPath) -> None:
+    """Stage src at dst without copying the data if possible.
+
+    A hard link is created when src and dst are on the same filesystem, otherwise the file is copied.
+    The staged file must be treated as read-only, since it may share the data with src.
+    """
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        if os.path.samefile(src, dst):
+            return  # already staged
+        # dst may be a hard link to another file, replace it instead of writing through it
+        os.unlink(dst)
+        link_file(src, dst)
+    except OSError as e:
+        if e.errno not in LINK_UNSUPPORTED_ERRNOS:
+            raise
+        copy_file(src, dst)
+
+
+def same_text(a: StrPath, b: StrPath) -> bool:
+    """Check whether two files have the same text, so line endings do not matter.
+
+    The bytes are compared first, only files which differ are read again
+    in text mode, block by block with universal newlines.
+    """
+    if filecmp.cmp(a, b, shallow=False):
+        return True
+    with open(a, 'r') as f1, open(b, 'r') as f2:
+        while True:
+            block = f1.read(SAME_TEXT_BLOCK_SIZE)
+            if block != f2.read(SAME_TEXT_BLOCK_SIZE):
+                return False
+            if not block:
+                return True
+
+
+def scan_tree(root: StrPath, prefix: str = '') -> Iterator[Tuple[os.DirEntry, str]]:
+    """Recursively scan a directory in sorted order.
+
+    Yields each entry with its archive name relative to root,
+    a directory is yielded (with a trailing slash) before its content.
+    """
+    with os.scandir(root) as it:
+        entries = sorted(it, key=lambda e: e.name)
+    for entry in entries:
+        arcname = f'{prefix}{entry.name}'
+        if entry.is_dir(follow_symlinks=False):
+            yield entry, f'{arcname}/'
+            yield from scan_tree(entry.path, f'{arcname}/')
+        else:
+            yield entry, arcname
+
+
+def _read_bytes(path: StrPath) -> bytes:
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def read_files(files: Iterable[Tuple[StrPath, int]], max_workers: Optional[int] = None) -> Iterator[bytes]:
+    """Read files on a thread pool and yield their contents in order.
+
+    Each file is given with its size, files are read ahead until READ_AHEAD_BYTES are buffered,
+    so a consumer writing the contents one by one overlaps with the reads of the next files.
+    Every file is read whole, only pass files up to READ_AHEAD_MAX_FILE_SIZE.
+    """
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: Deque[Tuple[Future, int]] = collections.deque()
+        buffered = 0
+        for path, size in files:
+            while pending and buffered + size > READ_AHEAD_BYTES:
+                future, future_size = pending.popleft()
+                buffered -= future_size
+                yield future.result()
+            pending.append((executor.submit(_read_bytes, path), size))
+            buffered += size
+        while pending:
+            yield pending.popleft()[0].result()
+
+
+def _get_member_path(info: zipfile.ZipInfo, path: StrPath) -> Optional[str]:
+    """Get the target path of a zip member, sanitized like ZipFile.extract does."""
+    arcname = info.filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    # remove the drive, absolute path and '..' components, so the member can not escape from path
+    arcname = os.path.splitdrive(arcname)[1]
+    arcname = os.path.sep.join(x for x in arcname.split(os.path.sep) if x not in ('', os.path.curdir, os.path.pardir))
+    if not arcname:
+        return None
+    return os.path.join(path, arcname)
+
+
+def extract_zip(package: StrPath, path: StrPath, max_workers: Optional[int] = None) -> None:
+    """Extract all members of a zip file to path.
+
+    The directories are created up front, then the files are extracted by a thread pool,
+    each worker reads the package through its own ZipFile handle since ZipFile is not thread-safe.
+    """
+    # the package is read through a large buffer, so the headers of small members
+    # which are next to each other are served without extra read syscalls
+    with open(package, 'rb', buffering=ZIP_COPY_BUFSIZE) as f, zipfile.ZipFile(f, 'r') as zip_ref:
+        infos = zip_ref.infolist()
+
+    dirs: Set[str] = set()
+    members: List[Tuple[zipfile.ZipInfo, str]] = []
+    for info in infos:
+        target = _get_member_path(info, path)
+        if target is None:
+            continue
+        parent = target if info.is_dir() else os.path.dirname(target)
+        if parent not in dirs:
+            os.makedirs(parent, exist_ok=True)
+            dirs.add(parent)
+        if not info.is_dir():
+            members.append((info, target))
+
+    local = threading.local()
+    handles: List[Tuple[BinaryIO, zipfile.ZipFile]] = []
+
+    def extract(member: Tuple[zipfile.ZipInfo, str]) -> None:
+        info, target = member
+        if info.file_size == 0:
+            # nothing to decompress, just create the file without reading the member
+            open(target, 'wb').close()
+            return
+        if (zip_ref := getattr(local, 'zip_ref', None)) is None:
+            f = open(package, 'rb', buffering=ZIP_COPY_BUFSIZE)
+            zip_ref = local.zip_ref = zipfile.ZipFile(f, 'r')
+            handles.append((f, zip_ref))
+        with zip_ref.open(info) as src, open(target, 'wb') as dst:
+            shutil.copyfileobj(src, dst, ZIP_COPY_BUFSIZE)
+
+    if max_workers is None:
+        max_workers = min(8, os.cpu_count() or 1)
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(extract, members))
+    finally:
+        # ZipFile does not close a file object passed to it
+        for f, zip_ref in handles:
+            zip_ref.close()
+            f.close()
+
+
+@functools.lru_cache(maxsize=16)
+def _load_config(config_file: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    # mtime and size are only part of the cache key, so a modified file is parsed again
+    with open(config_file, 'rb') as f:
+        return tomli.load(f)
+
+
 def load_config(config_file: StrPath):
     try:
-        with open(config_file, 'r') as f:
-            return tomli.loads(f.read())
+        st = os.stat(config_file)
+        # return a copy, the caller may update the config in place
+        return copy.deepcopy(_load_config(os.fspath(config_file), st.st_mtime_ns, st.st_size))
     except FileNotFoundError:
         raise ImportError('\'config.toml\' not found!')
     except tomli.TOMLDecodeError:
@@ -22,6 +22,11 @@ def test_version():
     assert len(__version__) > 0
 
 
+def test_dir():
+    import p2d
+    assert set(p2d.__all__) <= set(dir(p2d))
+
+
 def test_cli_version(capsys):
     from p2d import __version__
     from p2d.cli import main
@@ -43,14 +48,39 @@ def test_confirm(capsys, monkeypatch, skip_confirmation):
         assert "Are you sure to continue? [y/N]" in captured.out
 
 
+@pytest.mark.parametrize('value, expected', [
+    (None, 1), ('0', 0), ('9', 9), ('fast', 1), ('-1', 1), ('10', 1),
+])
+def test_getenv_int(monkeypatch, value, expected):
+    from p2d.p2d import _getenv_int
+    if value is None:
+        monkeypatch.delenv('P2D_ZIP_LEVEL', raising=False)
+    else:
+        monkeypatch.setenv('P2D_ZIP_LEVEL', value)
+    assert _getenv_int('P2D_ZIP_LEVEL', 1, minimum=0, maximum=9) == expected
+
+
+def test_problem_xml_cache(tmp_path):
+    from p2d.p2d import Polygon2DOMjudge
+    test_data_dir = Path(__file__).parent / 'test_data'
+    with zipfile.ZipFile(test_data_dir / 'little-h-reboot-7$linux.zip', 'r') as zip_ref:
+        problem_xml = Path(zip_ref.extract('problem.xml', tmp_path))
+    root = Polygon2DOMjudge.Problem._parse(problem_xml, cache=True)
+    assert Polygon2DOMjudge.Problem._parse(problem_xml, cache=True) is root
+    assert Polygon2DOMjudge.Problem._parse(problem_xml) is not root
+    problem_xml.write_text(problem_xml.read_text(encoding='utf-8') + '\n', encoding='utf-8')
+    assert Polygon2DOMjudge.Problem._parse(problem_xml, cache=True) is not root
+
+
 @pytest.mark.parametrize('extract', [True, False], ids=['dir', 'zip'])
-@pytest.mark.parametrize('package_name, args, assertion, expectation', load_api_test_data())
-def test_api(temp_dir, package_name, extract, args, assertion, expectation):
+@pytest.mark.parametrize('package_name, args, output, assertion, expectation', load_api_test_data())
+def test_api(temp_dir, package_name, extract, args, output, assertion, expectation):
     test_data_dir = Path(__file__).parent / 'test_data'
     polygon_package_dir = temp_dir / 'example-polygon-dir'
-    domjudge_package_dir = temp_dir / 'example-domjudge-dir'
     polygon_package = temp_dir / 'example-polygon.zip'
-    domjudge_package = temp_dir / 'example-domjudge.zip'
+    domjudge_package = temp_dir / output
+    # the extracted package sits next to the output zip file, see assertions.assert_compress_type
+    domjudge_package_dir = domjudge_package.with_suffix('')
 
     if (test_data_dir / package_name).exists():
         # there are some test cases that tests the package is not found
@@ -77,14 +107,47 @@ def test_api(temp_dir, package_name, extract, args, assertion, expectation):
         assertion(domjudge_package_dir)
 
 
+def test_process_twice_keeps_package(tmp_path):
+    from p2d import Polygon2DOMjudge
+    test_data_dir = Path(__file__).parent / 'test_data'
+    package_dir = tmp_path / 'pkg'
+    with zipfile.ZipFile(test_data_dir / 'little-h-reboot-7$linux.zip', 'r') as zip_ref:
+        zip_ref.extractall(package_dir)
+    before = {path: path.read_bytes() for path in package_dir.rglob('*') if path.is_file()}
+    (tmp_path / 'stage').mkdir()
+    # the staged files are hard links to the package, staging again must not write through them
+    for output in ('out1', 'out2'):
+        Polygon2DOMjudge(package_dir, tmp_path / 'stage', tmp_path / output, 'A').process()
+    assert {path: path.read_bytes() for path in package_dir.rglob('*') if path.is_file()} == before
+
+
+def test_api_output_buffer(temp_dir, caplog):
+    import io
+    import logging
+    caplog.set_level(logging.INFO)
+    from p2d import convert
+    test_data_dir = Path(__file__).parent / 'test_data'
+    domjudge_package = temp_dir / 'example-domjudge.zip'
+    buffer = io.BytesIO()
+    convert(test_data_dir / 'little-h-reboot-7$linux.zip', domjudge_package,
+            short_name='A', skip_confirmation=True, output_buffer=buffer)
+    assert not domjudge_package.exists()
+    assert 'Output: the output buffer' in caplog.text
+    assert 'example-domjudge.zip' not in caplog.text
+    with zipfile.ZipFile(buffer, 'r') as zip_ref:
+        assert zip_ref.testzip() is None
+        assert 'domjudge-problem.ini' in zip_ref.namelist()
+
+
 @pytest.mark.parametrize('extract', [True, False], ids=['dir', 'zip'])
-@pytest.mark.parametrize('package_name, args, assertion, expectation', load_cli_test_data())
-def test_cli(temp_dir, package_name, args, extract, assertion, expectation):
+@pytest.mark.parametrize('package_name, args, output, assertion, expectation', load_cli_test_data())
+def test_cli(temp_dir, package_name, args, output, extract, assertion, expectation):
     test_data_dir = Path(__file__).parent / 'test_data'
     polygon_package_dir = temp_dir / 'example-polygon-dir'
-    domjudge_package_dir = temp_dir / 'example-domjudge-dir'
     polygon_package = temp_dir / 'example-polygon.zip'
-    domjudge_package = temp_dir / 'example-domjudge.zip'
+    domjudge_package = temp_dir / output
+    # the extracted package sits next to the output zip file, see assertions.assert_compress_type
+    domjudge_package_dir = domjudge_package.with_suffix('')
 
     if (test_data_dir / package_name).exists():
         # there are some test cases that tests the package is not found
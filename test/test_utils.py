@@ -1,3 +1,6 @@
+import os
+import shutil
+
 import pytest
 
 
@@ -24,3 +27,102 @@ def test_get_normalized_lang(lang, expected):
     from p2d.utils import get_normalized_lang
     actual = get_normalized_lang(lang)
     assert actual == expected, f'Expected: {expected}, Actual: {actual}'
+
+
+def test_copy_file(tmp_path):
+
+    from p2d.utils import copy_file
+    src = tmp_path / 'src.txt'
+    dst = tmp_path / 'dst.txt'
+    src.write_bytes(b'1 2\r\n3 4\n')
+    dst.write_bytes(b'stale content which is longer than the source')
+    copy_file(src, dst)
+    assert dst.read_bytes() == src.read_bytes()
+    # copying a file onto itself, or onto a hard link of itself, must not truncate it
+    link = tmp_path / 'link.txt'
+    os.link(src, link)
+    for target in (src, link):
+        with pytest.raises(shutil.SameFileError):
+            copy_file(src, target)
+    assert src.read_bytes() == b'1 2\r\n3 4\n'
+
+
+def test_link_file(tmp_path):
+
+    from p2d.utils import link_file
+    src = tmp_path / 'src.txt'
+    dst = tmp_path / 'dst.txt'
+    src.write_bytes(b'1 2\n')
+    link_file(src, dst)
+    assert dst.read_bytes() == src.read_bytes()
+    # staging another file at dst replaces the link instead of writing through it
+    other = tmp_path / 'other.txt'
+    other.write_bytes(b'3\n')
+    link_file(other, dst)
+    assert dst.read_bytes() == b'3\n'
+    assert src.read_bytes() == b'1 2\n'
+    link_file(other, dst)
+    assert other.read_bytes() == b'3\n'
+
+
+def test_same_text(tmp_path, monkeypatch):
+
+    from p2d import utils
+    # a small block splits the CRLF across two reads
+    monkeypatch.setattr(utils, 'SAME_TEXT_BLOCK_SIZE', 3)
+    lf = tmp_path / 'lf.txt'
+    crlf = tmp_path / 'crlf.txt'
+    other = tmp_path / 'other.txt'
+    lf.write_bytes(b'1 2\n3 4\n')
+    crlf.write_bytes(b'1 2\r\n3 4\r\n')
+    other.write_bytes(b'1 2\n3 5\n')
+    assert utils.same_text(lf, lf)
+    assert utils.same_text(lf, crlf)
+    assert not utils.same_text(lf, other)
+    assert not utils.same_text(crlf, other)
+
+
+def test_read_files(tmp_path, monkeypatch):
+
+    from p2d import utils
+    # a small budget forces the reads to be drained while files are still being submitted
+    monkeypatch.setattr(utils, 'READ_AHEAD_BYTES', 4)
+    files = []
+    for i in range(16):
+        path = tmp_path / f'{i:02d}.in'
+        path.write_bytes(f'{i}\n'.encode())
+        files.append((path, path.stat().st_size))
+    assert list(utils.read_files(files, max_workers=4)) == [path.read_bytes() for path, _ in files]
+
+
+def test_extract_zip(tmp_path):
+
+    import zipfile
+    from p2d.utils import extract_zip
+    package = tmp_path / 'package.zip'
+    with zipfile.ZipFile(package, 'w') as zip_ref:
+        zip_ref.writestr('problem.xml', '<problem/>')
+        zip_ref.writestr('tests/01', '1 2\n')
+        zip_ref.writestr('tests/02', '')
+        zip_ref.writestr('statements/', '')
+        zip_ref.writestr('../evil', 'evil')
+    extract_zip(package, tmp_path / 'out')
+    assert (tmp_path / 'out' / 'problem.xml').read_text() == '<problem/>'
+    assert (tmp_path / 'out' / 'tests' / '01').read_text() == '1 2\n'
+    assert (tmp_path / 'out' / 'tests' / '02').read_text() == ''
+    assert (tmp_path / 'out' / 'statements').is_dir()
+    assert (tmp_path / 'out' / 'evil').is_file()
+    assert not (tmp_path / 'evil').exists()
+
+
+def test_load_config(tmp_path):
+
+    from p2d.utils import load_config
+    config_file = tmp_path / 'config.toml'
+    config_file.write_text('language_preference = ["chinese"]\n')
+    config = load_config(config_file)
+    assert config == {'language_preference': ['chinese']}
+
+    # the cached config is not affected by updating the returned one
+    config['language_preference'].append('english')
+    assert load_config(config_file) == {'language_preference': ['chinese']}
@@ -1,3 +1,5 @@
+import zipfile
+
 import yaml
 
 
@@ -68,3 +70,12 @@ def assert_magic_string(package_dir, result, name, magic_string):
     assert_submission(package_dir, result, name)
     with open(package_dir / 'submissions' / result / name, 'r') as f:
         assert magic_string in f.read()
+
+
+def assert_compress_type(package_dir, expect):
+    # the output zip file is next to the extracted package
+    with zipfile.ZipFile(package_dir.with_suffix('.zip'), 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if info.is_dir():
+                continue
+            assert info.compress_type == getattr(zipfile, expect), f'{info.filename}: {info.compress_type}'
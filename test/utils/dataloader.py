@@ -54,6 +54,7 @@ def load_cli_test_data():
         yield pytest.param(
             test_case['input'],                                 # package_name
             test_case['args'],                                  # args
+            test_case.get('output', 'example-domjudge.zip'),    # output
             _get_asserts(test_case.get('assertions', None)),    # asserts
             _get_raises(test_case.get('raise', None)),          # expectation
             id=name,
@@ -67,6 +68,7 @@ def load_api_test_data():
         yield pytest.param(
             test_case['input'],                                 # package_name
             test_case['args'],                                  # args
+            test_case.get('output', 'example-domjudge.zip'),    # output
             _get_asserts(test_case.get('assertions', None)),    # asserts
             _get_raises(test_case.get('raise', None)),          # expectation
             id=name,